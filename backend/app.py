@@ -2,8 +2,9 @@ import os
 import numpy as np
 import logging
 import threading
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
+from profiling import ADMIN_TOKEN, MAX_PROFILE_SECONDS, StageTrace, is_admin, sample_stacks
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -147,24 +148,30 @@ def rule_based_predict(landmarks):
     return "Unknown", 0.0
 
 
-def classify(landmarks):
+# Signs the rule engine handles better than the TF model
+FORCE_RULE_SIGNS = [
+    "ONE", "WAIT", "GOOD", "SORRY", "PLEASE", "LITTLE", "PERFECT", "WATER",
+    "STOP", "THANK YOU"
+]
+TF_CONF_THRESHOLD = 0.78
+
+
+def classify(landmarks, trace=None):
     """Route to TF model if available, else rule-based."""
     rule_gesture, rule_conf = rule_based_predict(landmarks)
+    if trace: trace.lap("rule_based_predict")
     
     # Priority for new/problematic signs explicitly mentioned by user
-    FORCE_RULE_SIGNS = [
-        "ONE", "WAIT", "GOOD", "SORRY", "PLEASE", "LITTLE", "PERFECT", "WATER",
-        "STOP", "THANK YOU"
-    ]
     if rule_gesture in FORCE_RULE_SIGNS:
         return rule_gesture, rule_conf
 
     if HAS_TF and static_model is not None:
         arr = np.array(landmarks).reshape(1, -1)
         pred = static_model.predict(arr, verbose=0)[0]
+        if trace: trace.lap("keras_predict")
         idx = int(np.argmax(pred))
         conf = float(np.max(pred))
-        if conf > 0.78 and idx < len(CLASSES):
+        if conf > TF_CONF_THRESHOLD and idx < len(CLASSES):
             return CLASSES[idx], conf
             
     if rule_gesture != "Unknown":
@@ -199,7 +206,13 @@ def health():
 def predict():
     global last_gesture, repeat_count, current_sentence, history
 
+    # Opt-in stage tracing: X-Trace: 1 plus a valid admin token
+    trace = None
+    if ADMIN_TOKEN and request.headers.get('X-Trace') == '1' and is_admin(request.headers.get('X-Admin-Token')):
+        trace = StageTrace()
+
     data = request.json or {}
+    if trace: trace.lap("parse_json")
     multi_landmarks = data.get('multi_landmarks', [])
     # Support old 'landmarks' key for backward compatibility
     single_landmarks = data.get('landmarks')
@@ -209,13 +222,13 @@ def predict():
     lang = data.get('lang', 'en')
 
     if not multi_landmarks:
-        return jsonify({
+        return _traced_response({
             "detections": [],
             "gesture": "No Hand",
             "confidence": 0,
             "sentence": " ".join(current_sentence),
             "history": history[-10:]
-        })
+        }, trace)
 
     detections = []
     best_gesture = "Unknown"
@@ -223,7 +236,8 @@ def predict():
 
     for landmarks in multi_landmarks:
         flat = np.array(landmarks).flatten().tolist()
-        gesture, confidence = classify(flat)
+        if trace: trace.lap("flatten")
+        gesture, confidence = classify(flat, trace)
         display_gesture = TAMIL_MAP.get(gesture, gesture) if lang == 'ta' else gesture
         
         detections.append({
@@ -235,7 +249,9 @@ def predict():
             max_conf = confidence
             best_gesture = gesture
 
+    if trace: trace.lap("build_detections")
     logger.info(f"Detections: {detections}")
+    if trace: trace.lap("logging")
     # ── Sentence Builder with debounce (using the best detection) ──
     if best_gesture not in ("Unknown", "No Hand") and max_conf > 0.75:
         if best_gesture == last_gesture:
@@ -252,15 +268,29 @@ def predict():
                 if len(current_sentence) > 10:
                     current_sentence.pop(0)
 
+    if trace: trace.lap("sentence_builder")
+
     primary_display = TAMIL_MAP.get(best_gesture, best_gesture) if lang == 'ta' else best_gesture
 
-    return jsonify({
+    return _traced_response({
         "detections": detections,
         "gesture":    primary_display,
         "confidence": max_conf,
         "sentence":   " ".join(current_sentence),
         "history":    history[-10:]
-    })
+    }, trace)
+
+
+def _traced_response(payload, trace):
+    """jsonify the payload, attaching stage timings when the request is traced."""
+    if not trace:
+        return jsonify(payload)
+    payload["trace"] = trace.as_dict()
+    response = jsonify(payload)
+    # Serialization happens after the body is built, so it is only in the header
+    trace.lap("serialize_json")
+    response.headers['Server-Timing'] = trace.server_timing()
+    return response
 
 
 @app.route('/speak', methods=['POST'])
@@ -323,6 +353,30 @@ def list_gestures():
     return jsonify({"gestures": sorted(all_gestures)})
 
 
+@app.route('/admin/profile', methods=['GET'])
+def admin_profile():
+    """
+    Sample all threads of this worker for ?seconds=N (default 5) and return
+    collapsed stacks for flamegraph.pl / speedscope. Requires X-Admin-Token.
+    Run gunicorn with --threads > 1 so requests are served while sampling.
+    Capped at MAX_PROFILE_SECONDS, below gunicorn's default 30s --timeout.
+    """
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "profiling disabled"}), 404
+    if not is_admin(request.headers.get('X-Admin-Token')):
+        return jsonify({"error": "forbidden"}), 403
+    try:
+        seconds = float(request.args.get('seconds', 5))
+    except ValueError:
+        return jsonify({"error": f"seconds must be a number (max {MAX_PROFILE_SECONDS})"}), 400
+
+    seconds = min(max(seconds, 0.1), MAX_PROFILE_SECONDS)
+    collapsed, samples = sample_stacks(seconds)
+    logger.info(f"Profiled worker {os.getpid()} for {seconds}s ({samples} samples)")
+    return Response(collapsed, mimetype='text/plain',
+                    headers={"X-Worker-Pid": str(os.getpid()), "X-Samples": str(samples)})
+
+
 @app.route('/reset', methods=['POST'])
 def reset():
     global current_sentence, history, last_gesture, repeat_count
@@ -0,0 +1,374 @@
+"""
+Offline evaluation of the gesture engines on the captured dataset/.
+
+Runs the rule engine, the TF model and the production classify() routing
+over every sample in vectorized batches and reports per-class
+precision/recall, confusion matrices, confidence-threshold sweeps,
+throughput, and which rule-predicted signs are worth forcing past the TF model.
+
+Usage:
+    python backend/benchmark/evaluate_engines.py
+    python backend/benchmark/evaluate_engines.py --sequences --batch-size 1024 --out report.json
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path to import the backend app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import app
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '../../dataset')
+THRESHOLDS = [round(t, 2) for t in np.arange(0.50, 0.96, 0.05)]
+# Forcing a sign may give up at most this much accuracy on that sign's samples
+ROUTING_TOLERANCE = 0.02
+PARITY_SAMPLES = 500
+SCALAR_SAMPLES = 200
+SAMPLE_SEED = 0
+
+RULE_ORDER = [
+    # (gesture, confidence) in the same priority order as app.rule_based_predict
+    ("HELLO", 0.95), ("YES", 0.92), ("NO", 0.90), ("I LOVE YOU", 0.96), ("HELP", 0.88),
+    ("STOP", 0.86), ("THANK YOU", 0.89), ("ONE", 0.91), ("LITTLE", 0.88), ("GOOD", 0.90),
+    ("PERFECT", 0.87), ("SORRY", 0.85), ("PLEASE", 0.86), ("WAIT", 0.87), ("WATER", 0.84),
+]
+
+
+# ─────────────────────────────────────────────
+# Dataset
+# ─────────────────────────────────────────────
+def load_dataset(include_sequences=False):
+    """Load dataset/<LABEL>/*.npy (and optionally every frame of dataset/sequences/<label>/*.npy)."""
+    X, y = [], []
+    for label_dir in sorted(glob.glob(os.path.join(DATA_PATH, '*'))):
+        label = os.path.basename(label_dir)
+        if label == 'sequences' or not os.path.isdir(label_dir):
+            continue
+        for path in sorted(glob.glob(os.path.join(label_dir, '*.npy'))):
+            sample = np.load(path)
+            if sample.size == 63:
+                X.append(sample.reshape(63))
+                y.append(label.upper())
+
+    if include_sequences:
+        for path in sorted(glob.glob(os.path.join(DATA_PATH, 'sequences', '*', '*.npy'))):
+            label = os.path.basename(os.path.dirname(path)).upper()
+            seq = np.load(path)
+            if seq.ndim == 2 and seq.shape[1] == 63:
+                X.extend(seq)
+                y.extend([label] * len(seq))
+
+    return np.array(X, dtype=np.float32).reshape(-1, 63), np.array(y)
+
+
+# ─────────────────────────────────────────────
+# Vectorized Engines
+# ─────────────────────────────────────────────
+def rule_based_predict_batch(batch):
+    """Vectorized port of app.rule_based_predict over an (N, 63) batch."""
+    lm = np.asarray(batch, dtype=float).reshape(-1, 21, 3)
+
+    def get_dist(p1_idx, p2_idx):
+        return np.linalg.norm(lm[:, p1_idx] - lm[:, p2_idx], axis=1)
+
+    index_up  = get_dist(8, 0)  > get_dist(6, 0)
+    middle_up = get_dist(12, 0) > get_dist(10, 0)
+    ring_up   = get_dist(16, 0) > get_dist(14, 0)
+    pinky_up  = get_dist(20, 0) > get_dist(18, 0)
+    thumb_up  = get_dist(4, 17) > get_dist(2, 17)
+
+    count = index_up.astype(int) + middle_up + ring_up + pinky_up
+    index_dn, middle_dn, ring_dn, pinky_dn, thumb_dn = ~index_up, ~middle_up, ~ring_up, ~pinky_up, ~thumb_up
+
+    conditions = [
+        (count == 4) & thumb_up,                                # HELLO
+        (count == 0) & thumb_dn,                                # YES
+        index_up & middle_up & ring_dn & pinky_dn,              # NO
+        index_up & pinky_up & middle_dn & ring_dn & thumb_up,   # I LOVE YOU
+        thumb_up & (count == 0),                                # HELP
+        count == 4,                                             # STOP
+        index_up & middle_up & ring_up & pinky_dn,              # THANK YOU
+        index_up & middle_dn & ring_dn & pinky_dn & thumb_dn,   # ONE
+        pinky_up & index_dn & middle_dn & ring_dn & thumb_dn,   # LITTLE
+        thumb_up & index_up & middle_dn & ring_dn & pinky_dn,   # GOOD
+        thumb_up & middle_up & index_dn & ring_dn & pinky_dn,   # PERFECT
+        middle_up & pinky_up & index_dn & ring_dn,              # SORRY
+        index_up & ring_up & pinky_up & middle_dn,              # PLEASE
+        middle_up & ring_up & pinky_up & index_dn,              # WAIT
+        thumb_up & ring_up & pinky_up & index_dn & middle_dn,   # WATER
+    ]
+    gestures = np.select(conditions, [g for g, _ in RULE_ORDER], default="Unknown").astype(object)
+    confidences = np.select(conditions, [c for _, c in RULE_ORDER], default=0.0)
+    return gestures, confidences
+
+
+def spread_sample(X, n):
+    """Seeded random rows from the whole set; X is ordered by label, so the first rows are not representative."""
+    rng = np.random.default_rng(SAMPLE_SEED)
+    return X[rng.choice(len(X), size=min(n, len(X)), replace=False)]
+
+
+def check_rule_parity(X):
+    """Guard against the vectorized port drifting from app.rule_based_predict."""
+    sample = spread_sample(X, PARITY_SAMPLES)
+    batch_gestures, _ = rule_based_predict_batch(sample)
+    scalar_gestures = [app.rule_based_predict(x.tolist())[0] for x in sample]
+    mismatches = int(np.sum(batch_gestures != np.array(scalar_gestures, dtype=object)))
+    if mismatches:
+        raise RuntimeError(f"rule_based_predict_batch disagrees with app.rule_based_predict "
+                           f"on {mismatches}/{len(sample)} samples; update RULE_ORDER/conditions")
+
+
+def tf_decode(probs, threshold):
+    """Apply the classify() acceptance rule to raw model outputs."""
+    idx = np.argmax(probs, axis=1)
+    conf = np.max(probs, axis=1)
+    classes = np.array(app.CLASSES + ["Unknown"], dtype=object)
+    accepted = (conf > threshold) & (idx < len(app.CLASSES))
+    return np.where(accepted, classes[np.minimum(idx, len(app.CLASSES))], "Unknown"), conf
+
+
+def route(rule_gestures, tf_gestures):
+    """Vectorized classify(): forced rule signs, then TF, then any rule match."""
+    forced = np.isin(rule_gestures, app.FORCE_RULE_SIGNS)
+    tf_hit = tf_gestures != "Unknown"
+    rule_hit = rule_gestures != "Unknown"
+    return np.where(forced, rule_gestures,
+                    np.where(tf_hit, tf_gestures,
+                             np.where(rule_hit, rule_gestures, "Unknown")))
+
+
+def timed(fn, *args):
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = fn(*args)
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def in_batches(fn, X, batch_size):
+    outputs = [fn(X[i:i + batch_size]) for i in range(0, len(X), batch_size)]
+    if isinstance(outputs[0], tuple):
+        return tuple(np.concatenate(parts) for parts in zip(*outputs))
+    return np.concatenate(outputs)
+
+
+def run_engines(X, batch_size):
+    """Return {engine: (predicted_labels, wall_s, cpu_s)} plus raw TF outputs for sweeps."""
+    results = {}
+    (rule_gestures, _), wall, cpu = timed(in_batches, rule_based_predict_batch, X, batch_size)
+    results["rule"] = (rule_gestures, wall, cpu)
+
+    probs = None
+    if app.HAS_TF and app.static_model is not None:
+        predict = lambda b: app.static_model.predict(b, batch_size=batch_size, verbose=0)
+        probs, wall, cpu = timed(in_batches, predict, X, batch_size)
+        tf_gestures, _ = tf_decode(probs, app.TF_CONF_THRESHOLD)
+        results["tf"] = (tf_gestures, wall, cpu)
+
+        # classify() only calls the model when the rule engine does not force a sign
+        needs_tf = ~np.isin(rule_gestures, app.FORCE_RULE_SIGNS)
+        if needs_tf.any():
+            _, tf_wall, tf_cpu = timed(in_batches, predict, X[needs_tf], batch_size)
+        else:
+            tf_wall = tf_cpu = 0.0
+        results["classify"] = (route(rule_gestures, tf_gestures),
+                               results["rule"][1] + tf_wall, results["rule"][2] + tf_cpu)
+    else:
+        print("TF model not available: evaluating the rule engine only (classify == rule).")
+        results["classify"] = results["rule"]
+    return results, rule_gestures, probs
+
+
+def scalar_latency(X):
+    """
+    Per-call cost of the production path (one hand per call, as /predict does),
+    where fixed per-call overhead dominates. "tf" is one single-row Keras
+    predict, as classify() issues it.
+    """
+    sample = [x.tolist() for x in spread_sample(X, SCALAR_SAMPLES)]
+    calls = [("rule", app.rule_based_predict), ("classify", app.classify)]
+    if app.HAS_TF and app.static_model is not None:
+        calls.append(("tf", lambda x: app.static_model.predict(np.array(x).reshape(1, -1), verbose=0)))
+
+    latency = {}
+    for name, fn in calls:
+        wall, cpu = time.perf_counter(), time.process_time()
+        for x in sample:
+            fn(x)
+        n = max(len(sample), 1)
+        latency[name] = {
+            "wall_ms": round((time.perf_counter() - wall) * 1000 / n, 4),
+            "cpu_ms": round((time.process_time() - cpu) * 1000 / n, 4),
+        }
+    return latency
+
+
+# ─────────────────────────────────────────────
+# Metrics
+# ─────────────────────────────────────────────
+def confusion(y_true, y_pred, labels):
+    index = {label: i for i, label in enumerate(labels)}
+    matrix = np.zeros((len(labels), len(labels)), dtype=int)
+    np.add.at(matrix, ([index[t] for t in y_true], [index[p] for p in y_pred]), 1)
+    return matrix
+
+
+def per_class(matrix, labels):
+    tp = np.diag(matrix)
+    predicted = matrix.sum(axis=0)
+    support = matrix.sum(axis=1)
+    precision = np.divide(tp, predicted, out=np.zeros(len(tp)), where=predicted > 0)
+    recall = np.divide(tp, support, out=np.zeros(len(tp)), where=support > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall,
+                   out=np.zeros(len(tp)), where=(precision + recall) > 0)
+    return {
+        label: {"precision": round(float(precision[i]), 4), "recall": round(float(recall[i]), 4),
+                "f1": round(float(f1[i]), 4), "support": int(support[i])}
+        for i, label in enumerate(labels) if support[i] > 0
+    }
+
+
+def summarize(y_true, y_pred):
+    correct = y_pred == y_true
+    known = y_pred != "Unknown"
+    return {
+        "accuracy": round(float(correct.mean()), 4),
+        "coverage": round(float(known.mean()), 4),
+        "precision_when_known": round(float(correct[known].mean()), 4) if known.any() else 0.0,
+    }
+
+
+def threshold_sweep(y_true, rule_gestures, probs):
+    sweep = {"tf": [], "classify": []}
+    for t in THRESHOLDS:
+        tf_gestures, _ = tf_decode(probs, t)
+        sweep["tf"].append({"threshold": t, **summarize(y_true, tf_gestures)})
+        sweep["classify"].append({"threshold": t, **summarize(y_true, route(rule_gestures, tf_gestures))})
+    return sweep
+
+
+def recommend_routing(y_true, rule_gestures, tf_gestures, rule_cost, tf_cost):
+    """
+    classify() forces a sign based on the rule engine's *prediction*, so group
+    samples by rule prediction g and compare, on that group:
+      forced:   every sample gets g, costing one rule call
+      unforced: TF answer when confident, else g, costing a rule call + a TF call
+    Costs are per-call CPU ms from scalar_latency. Forcing is recommended when
+    it gives more accuracy per CPU-ms and loses at most ROUTING_TOLERANCE accuracy.
+    """
+    forced_cost = max(rule_cost, 1e-6)
+    unforced_cost = max(rule_cost + tf_cost, 1e-6)
+    routing = {}
+    for g in sorted(set(rule_gestures) - {"Unknown"}):
+        group = rule_gestures == g
+        truth = y_true[group]
+        forced_acc = float(np.mean(truth == g))
+        unforced = np.where(tf_gestures[group] != "Unknown", tf_gestures[group], g)
+        unforced_acc = float(np.mean(truth == unforced))
+        forced_eff = forced_acc / forced_cost
+        unforced_eff = unforced_acc / unforced_cost
+        routing[str(g)] = {
+            "samples": int(group.sum()),
+            "forced_accuracy": round(forced_acc, 4),
+            "unforced_accuracy": round(unforced_acc, 4),
+            "forced_acc_per_cpu_ms": round(forced_eff, 2),
+            "unforced_acc_per_cpu_ms": round(unforced_eff, 2),
+            "currently_forced": g in app.FORCE_RULE_SIGNS,
+            "force": forced_eff >= unforced_eff and forced_acc >= unforced_acc - ROUTING_TOLERANCE,
+        }
+    return routing
+
+
+def evaluate(X, y, batch_size):
+    check_rule_parity(X)
+    results, rule_gestures, probs = run_engines(X, batch_size)
+    labels = sorted(set(y) | set(app.CLASSES)) + ["Unknown"]
+
+    engines = {}
+    for name, (pred, wall, cpu) in results.items():
+        matrix = confusion(y, pred, labels)
+        engines[name] = {
+            **summarize(y, pred),
+            "samples_per_s": round(len(X) / max(wall, 1e-9), 1),
+            "cpu_ms_per_sample": round(cpu * 1000 / len(X), 5),
+            "per_class": per_class(matrix, labels),
+            "confusion": {"labels": labels, "matrix": matrix.tolist()},
+        }
+
+    report = {
+        "samples": len(X),
+        "batch_size": batch_size,
+        "tf_threshold": app.TF_CONF_THRESHOLD,
+        "engines": engines,
+        "scalar_ms_per_call": scalar_latency(X),
+    }
+    if probs is not None:
+        report["threshold_sweep"] = threshold_sweep(y, rule_gestures, probs)
+        scalar = report["scalar_ms_per_call"]
+        report["routing"] = recommend_routing(y, rule_gestures, results["tf"][0],
+                                              scalar["rule"]["cpu_ms"], scalar["tf"]["cpu_ms"])
+    return report
+
+
+def print_report(report):
+    print(f"\nEvaluated {report['samples']} samples (batch size {report['batch_size']})")
+    print(f"{'engine':<10} {'acc':>7} {'cover':>7} {'samples/s':>12} {'cpu ms/sample':>14}")
+    for name, e in report["engines"].items():
+        print(f"{name:<10} {e['accuracy']:>7.3f} {e['coverage']:>7.3f} "
+              f"{e['samples_per_s']:>12} {e['cpu_ms_per_sample']:>14}")
+    print("Production per-call cost (ms, one hand per call):")
+    for name, c in report["scalar_ms_per_call"].items():
+        print(f"  {name:<10} wall {c['wall_ms']:>9}  cpu {c['cpu_ms']:>9}")
+
+    for name, e in report["engines"].items():
+        print(f"\n[{name}] per-class precision / recall / f1 (support)")
+        for label, m in e["per_class"].items():
+            print(f"  {label:<12} {m['precision']:.3f} / {m['recall']:.3f} / {m['f1']:.3f} ({m['support']})")
+
+    for name, rows in report.get("threshold_sweep", {}).items():
+        print(f"\n[{name}] threshold sweep (current {report['tf_threshold']})")
+        for r in rows:
+            print(f"  {r['threshold']:.2f}: acc {r['accuracy']:.3f}  coverage {r['coverage']:.3f}  "
+                  f"precision {r['precision_when_known']:.3f}")
+
+    if "routing" not in report:
+        print("\nNo TF model: routing recommendations need both engines.")
+        return
+    print("\nForcing per rule-predicted sign: accuracy (accuracy per per-call cpu-ms)")
+    print(f"  force = better accuracy per cpu-ms and at most {ROUTING_TOLERANCE} accuracy lost")
+    print(f"  {'rule says':<12} {'n':>6} {'forced':>18} {'rule then TF':>18}  now    recommend")
+    for g, r in report["routing"].items():
+        print(f"  {g:<12} {r['samples']:>6} "
+              f"{r['forced_accuracy']:>7.3f} ({r['forced_acc_per_cpu_ms']:>8}) "
+              f"{r['unforced_accuracy']:>7.3f} ({r['unforced_acc_per_cpu_ms']:>8})  "
+              f"{'force' if r['currently_forced'] else 'tf':<6} {'force' if r['force'] else 'tf'}")
+    forced = sorted(g for g, r in report["routing"].items() if r["force"])
+    print(f"Suggested FORCE_RULE_SIGNS: {forced}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare gesture engines for accuracy and speed")
+    parser.add_argument('--batch-size', type=int, default=512)
+    parser.add_argument('--sequences', action='store_true', help="Also evaluate frames from dataset/sequences")
+    parser.add_argument('--out', help="Write the full report as JSON")
+    args = parser.parse_args()
+
+    X, y = load_dataset(args.sequences)
+    if len(X) == 0:
+        print("No data found to evaluate. Capture samples first (collect_data.py or /capture).")
+        return
+
+    report = evaluate(X, y, args.batch_size)
+    print_report(report)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+Load test harness for the SignSync /predict API.
+
+Replays recorded (dataset/) or synthetic landmark streams from many simulated
+users against a locally started gunicorn server and steps concurrency up
+until the service stops scaling.
+
+Usage:
+    python backend/benchmark/load_test.py backend/benchmark/scenarios/baseline.json
+    python backend/benchmark/load_test.py scenario.json --workers 4 --out results.json
+    python backend/benchmark/load_test.py scenario.json --url http://127.0.0.1:5000
+"""
+import argparse
+import glob
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+HAS_PSUTIL = False
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    print("WARNING: psutil not found. Per-worker CPU/RSS will not be reported.")
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DATA_PATH = os.path.join(BACKEND_DIR, '..', 'dataset')
+
+DEFAULT_SCENARIO = {
+    "name": "default",
+    "workers": 2,
+    "host": "127.0.0.1",
+    "port": 5055,
+    "source": "synthetic",       # "synthetic" or "dataset"
+    "fps": 15,                   # frames per second per simulated user
+    "concurrency": [1, 2, 4, 8, 16],
+    "step_duration": 10,         # seconds per concurrency step
+    "warmup": 2,                 # seconds before measuring each step
+    "hands": {"1": 0.8, "2": 0.2},
+    "lang": {"en": 0.7, "ta": 0.3},
+    "timeout": 5,
+    "seed": 42,
+    "stream_length": 90,         # frames per synthetic stream
+    "num_streams": 32,
+}
+
+# Step is considered "not scaling" if throughput gains less than this fraction
+SCALING_GAIN = 0.10
+
+
+# ─────────────────────────────────────────────
+# Landmark Streams
+# ─────────────────────────────────────────────
+def synthetic_stream(rng, length):
+    """
+    Generate a plausible moving hand: wrist + 5 finger chains of 4 joints,
+    each finger randomly curled or extended, drifting slightly per frame.
+    """
+    wrist = np.array([rng.uniform(0.3, 0.7), rng.uniform(0.6, 0.9), 0.0])
+    extended = rng.random(5) > 0.5
+    angles = np.linspace(-0.9, 0.5, 5)   # thumb -> pinky spread
+    frames = []
+    for t in range(length):
+        drift = np.array([0.01 * np.sin(t / 7.0), 0.01 * np.cos(t / 9.0), 0.0])
+        pts = [wrist + drift]
+        for f in range(5):
+            direction = np.array([np.sin(angles[f]), -np.cos(angles[f]), 0.0])
+            reach = 0.05 if extended[f] else 0.02
+            for j in range(1, 5):
+                # Curled fingers fold back towards the wrist after the second joint
+                step = j if extended[f] or j <= 2 else 4 - j
+                pts.append(wrist + drift + direction * reach * step)
+        lm = np.array(pts) + rng.normal(0, 0.002, (21, 3))
+        frames.append(lm.tolist())
+    return frames
+
+
+def dataset_streams():
+    """
+    Load recorded streams: dataset/sequences/<label>/*.npy (T, 63) first,
+    then static samples dataset/<LABEL>/*.npy grouped per label.
+    """
+    streams = []
+    for path in sorted(glob.glob(os.path.join(DATA_PATH, 'sequences', '*', '*.npy'))):
+        seq = np.load(path)
+        if seq.ndim == 2 and seq.shape[1] == 63 and len(seq):
+            streams.append(seq.reshape(-1, 21, 3).tolist())
+
+    for label_dir in sorted(glob.glob(os.path.join(DATA_PATH, '*'))):
+        if os.path.basename(label_dir) == 'sequences' or not os.path.isdir(label_dir):
+            continue
+        samples = [np.load(p) for p in sorted(glob.glob(os.path.join(label_dir, '*.npy')))]
+        samples = [s.reshape(21, 3).tolist() for s in samples if s.size == 63]
+        if samples:
+            streams.append(samples)
+    return streams
+
+
+def build_streams(scenario, rng):
+    if scenario["source"] == "dataset":
+        streams = dataset_streams()
+        if streams:
+            return streams
+        print("No recorded landmarks found in dataset/. Falling back to synthetic streams.")
+    return [synthetic_stream(rng, scenario["stream_length"]) for _ in range(scenario["num_streams"])]
+
+
+def weighted_choice(rng, weights):
+    keys = list(weights.keys())
+    probs = np.array([weights[k] for k in keys], dtype=float)
+    return keys[rng.choice(len(keys), p=probs / probs.sum())]
+
+
+# ─────────────────────────────────────────────
+# Server Management
+# ─────────────────────────────────────────────
+def port_in_use(host, port):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        return sock.connect_ex((host, port)) == 0
+
+
+def start_server(host, port, workers):
+    # Otherwise /health would be answered by whatever already listens there
+    if port_in_use(host, port):
+        raise RuntimeError(f"{host}:{port} is already in use; stop that server or use --url to target it")
+    cmd = [
+        sys.executable, '-m', 'gunicorn',
+        '-w', str(workers),
+        '-b', f'{host}:{port}',
+        '--log-level', 'warning',
+        'app:app',
+    ]
+    print(f"Starting gunicorn with {workers} workers on {host}:{port}")
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                conn.close()
+                if proc.poll() is not None:
+                    raise RuntimeError(f"gunicorn exited with code {proc.returncode}")
+                if HAS_PSUTIL and not psutil.Process(proc.pid).children():
+                    proc.terminate()
+                    raise RuntimeError("/health answered but gunicorn has no workers")
+                return proc
+        except OSError:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("gunicorn did not become healthy within 60s")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+class ResourceSampler:
+    """Samples CPU% and RSS of every gunicorn worker while a step runs."""
+
+    def __init__(self, master_pid, interval=0.5):
+        self.master_pid = master_pid
+        self.interval = interval
+        self.samples = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if not HAS_PSUTIL or self.master_pid is None:
+            return
+        self.samples = {}
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            workers = psutil.Process(self.master_pid).children()
+        except psutil.Error:
+            return
+        for w in workers:
+            w.cpu_percent(None)   # prime the counter
+        while not self._stop.wait(self.interval):
+            for w in workers:
+                try:
+                    cpu = w.cpu_percent(None)
+                    rss = w.memory_info().rss
+                except psutil.Error:
+                    continue
+                self.samples.setdefault(w.pid, []).append((cpu, rss))
+
+    def stop(self):
+        if self._thread is None:
+            return {}
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        summary = {}
+        for pid, values in self.samples.items():
+            cpus = [c for c, _ in values]
+            rss = [r for _, r in values]
+            summary[str(pid)] = {
+                "cpu_avg": round(float(np.mean(cpus)), 1),
+                "cpu_max": round(float(np.max(cpus)), 1),
+                "rss_mb_max": round(max(rss) / (1024 * 1024), 1),
+            }
+        return summary
+
+
+# ─────────────────────────────────────────────
+# Simulated Users
+# ─────────────────────────────────────────────
+class SimulatedUser(threading.Thread):
+    """
+    Sends one /predict request per frame on a fixed fps schedule over a
+    keep-alive connection. Each user waits for its response before sending
+    the next frame, so a slow server delays later sends. Latency is timed
+    from the scheduled send, not the actual one, so those delays are counted
+    (no coordinated omission), and the delay itself is reported as slip.
+    """
+
+    def __init__(self, host, port, scenario, streams, seed, stop_event, results):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.scenario = scenario
+        self.rng = np.random.default_rng(seed)
+        self.streams = streams
+        self.stop_event = stop_event
+        self.results = results
+        self.lang = weighted_choice(self.rng, scenario["lang"])
+        self.n_hands = int(weighted_choice(self.rng, scenario["hands"]))
+        self.stream_ids = self.rng.choice(len(streams), size=self.n_hands)
+
+    def _connect(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.scenario["timeout"])
+
+    def run(self):
+        conn = self._connect()
+        interval = 1.0 / self.scenario["fps"]
+        next_send = time.perf_counter() + self.rng.uniform(0, interval)
+        frame = 0
+        while not self.stop_event.is_set():
+            now = time.perf_counter()
+            if now < next_send:
+                time.sleep(next_send - now)
+            hands = [self.streams[s][frame % len(self.streams[s])] for s in self.stream_ids]
+            # bytes, so http.client sends headers and body in one write (no Nagle/delayed-ACK stall)
+            body = json.dumps({"multi_landmarks": hands, "lang": self.lang}).encode('utf-8')
+            start = time.perf_counter()
+            slip = start - next_send
+            ok = False
+            try:
+                conn.request('POST', '/predict', body=body, headers={"Content-Type": "application/json"})
+                resp = conn.getresponse()
+                resp.read()
+                ok = resp.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = self._connect()
+            end = time.perf_counter()
+            self.results.append((end, end - next_send, end - start, slip, ok))
+            frame += 1
+            # Keep the original schedule: late frames stay late so slip accumulates
+            next_send += interval
+        conn.close()
+
+
+def run_step(host, port, scenario, streams, concurrency, sampler, seed):
+    stop_event = threading.Event()
+    results = []
+    users = [
+        SimulatedUser(host, port, scenario, streams, seed + i, stop_event, results)
+        for i in range(concurrency)
+    ]
+    for u in users:
+        u.start()
+
+    time.sleep(scenario["warmup"])
+    measure_start = time.perf_counter()
+    sampler.start()
+    time.sleep(scenario["step_duration"])
+    measure_end = time.perf_counter()
+    workers = sampler.stop()
+    stop_event.set()
+    for u in users:
+        u.join(timeout=scenario["timeout"] + 1)
+
+    window = [r for r in results if measure_start <= r[0] <= measure_end]
+    ok_rows = [r for r in window if r[4]]
+    latencies = np.array([r[1] for r in ok_rows]) * 1000
+    service = np.array([r[2] for r in ok_rows]) * 1000
+    slips = np.array([r[3] for r in window]) * 1000
+    errors = len(window) - len(ok_rows)
+    elapsed = measure_end - measure_start
+
+    def pct(values, q):
+        return round(float(np.percentile(values, q)), 2) if len(values) else None
+
+    return {
+        "concurrency": concurrency,
+        "target_rps": round(concurrency * scenario["fps"], 1),
+        "sent_rps": round(len(window) / elapsed, 1),
+        "throughput_rps": round(len(ok_rows) / elapsed, 1),
+        "requests": len(window),
+        "errors": errors,
+        "error_rate": round(errors / len(window), 4) if window else 0.0,
+        # Latency from the scheduled send time
+        "p50_ms": pct(latencies, 50),
+        "p95_ms": pct(latencies, 95),
+        "p99_ms": pct(latencies, 99),
+        # Time from the actual send to the response
+        "service_p50_ms": pct(service, 50),
+        "service_p99_ms": pct(service, 99),
+        # How far sends fell behind schedule (server backpressure or a saturated client)
+        "slip_p50_ms": pct(slips, 50),
+        "slip_p99_ms": pct(slips, 99),
+        "workers": workers,
+    }
+
+
+def find_knee(steps):
+    """Return the first concurrency at which throughput stops tracking the target rate."""
+    for i, cur in enumerate(steps):
+        if cur["error_rate"] > 0.01 or cur["throughput_rps"] < (1 - SCALING_GAIN) * cur["target_rps"]:
+            return cur["concurrency"]
+        if i == 0:
+            continue
+        prev = steps[i - 1]
+        gain = (cur["throughput_rps"] - prev["throughput_rps"]) / max(prev["throughput_rps"], 1e-9)
+        load_gain = (cur["target_rps"] - prev["target_rps"]) / max(prev["target_rps"], 1e-9)
+        if gain < SCALING_GAIN * load_gain:
+            return cur["concurrency"]
+    return None
+
+
+def print_report(report):
+    print(f"\nScenario: {report['scenario']['name']} | workers: {report['scenario']['workers']}")
+    print(f"{'users':>6} {'target':>8} {'sent':>8} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'slip99':>8} {'err%':>6}  workers (cpu% avg/max, rss MB)")
+    for s in report["steps"]:
+        workers = ", ".join(
+            f"{pid}:{w['cpu_avg']}/{w['cpu_max']}%,{w['rss_mb_max']}MB" for pid, w in s["workers"].items()
+        )
+        print(f"{s['concurrency']:>6} {s['target_rps']:>8} {s['sent_rps']:>8} {s['throughput_rps']:>8} "
+              f"{s['p50_ms']!s:>8} {s['p95_ms']!s:>8} {s['p99_ms']!s:>8} {s['slip_p99_ms']!s:>8} "
+              f"{s['error_rate'] * 100:>6.2f}  {workers}")
+        interval_ms = 1000.0 / report["scenario"]["fps"]
+        if s["slip_p99_ms"] is not None and s["slip_p99_ms"] > interval_ms and \
+                s["service_p99_ms"] is not None and s["service_p99_ms"] < interval_ms:
+            print(f"{'':>6} ^ sends fell behind while the server answered within {interval_ms:.0f} ms: "
+                  f"the load generator itself is saturated")
+    if report["knee"] is None:
+        print("Service kept scaling across all steps.")
+    else:
+        print(f"Service stops scaling at {report['knee']} concurrent users.")
+
+
+def load_scenario(path):
+    scenario = dict(DEFAULT_SCENARIO)
+    if path:
+        with open(path) as f:
+            scenario.update(json.load(f))
+    return scenario
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for /predict")
+    parser.add_argument('scenario', nargs='?', help="Scenario JSON file")
+    parser.add_argument('--workers', type=int, help="Override gunicorn worker count")
+    parser.add_argument('--url', help="Target an already running server instead of starting gunicorn")
+    parser.add_argument('--out', help="Write the full report as JSON")
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario)
+    if args.workers:
+        scenario["workers"] = args.workers
+
+    rng = np.random.default_rng(scenario["seed"])
+    streams = build_streams(scenario, rng)
+    print(f"Loaded {len(streams)} landmark streams ({scenario['source']})")
+
+    proc = None
+    if args.url:
+        parsed = urlparse(args.url)
+        host, port = parsed.hostname, parsed.port or 80
+    else:
+        host, port = scenario["host"], scenario["port"]
+        proc = start_server(host, port, scenario["workers"])
+
+    sampler = ResourceSampler(proc.pid if proc else None)
+    steps = []
+    try:
+        for concurrency in scenario["concurrency"]:
+            print(f"Running {concurrency} users at {scenario['fps']} fps for {scenario['step_duration']}s...")
+            steps.append(run_step(host, port, scenario, streams, concurrency, sampler, scenario["seed"]))
+    finally:
+        if proc is not None:
+            stop_server(proc)
+
+    report = {"scenario": scenario, "steps": steps, "knee": find_knee(steps)}
+    print_report(report)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import hmac
+import time
+import threading
+from collections import Counter
+
+# Profiling is only reachable when an admin token is configured.
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+# Stay under gunicorn's default 30s worker timeout, or the worker is killed mid-sample
+MAX_PROFILE_SECONDS = 25
+
+
+def is_admin(token):
+    """Constant-time check of the X-Admin-Token header against ADMIN_TOKEN."""
+    if not ADMIN_TOKEN or not token:
+        return False
+    # Compare bytes: compare_digest rejects non-ASCII str (headers arrive latin-1 decoded)
+    return hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8'))
+
+
+class StageTrace:
+    """
+    Per-request stage timer. lap(name) charges the time since the previous
+    lap to `name`; repeated stages (e.g. one classify per hand) accumulate.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.stages = {}
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + (now - self.last) * 1000
+        self.last = now
+
+    def as_dict(self):
+        result = {name: round(ms, 3) for name, ms in self.stages.items()}
+        result["total"] = round((self.last - self.start) * 1000, 3)
+        return result
+
+    def server_timing(self):
+        """Format stages as a Server-Timing header value."""
+        return ", ".join(f"{name.replace(' ', '_')};dur={ms}" for name, ms in self.as_dict().items())
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def sample_stacks(seconds, interval=0.005):
+    """
+    Sample the stacks of every other thread in this process for `seconds`
+    and return them in collapsed-stack format ("root;...;leaf count" per
+    line), ready for flamegraph.pl or speedscope.
+    """
+    seconds = min(max(float(seconds), 0.1), MAX_PROFILE_SECONDS)
+    own = threading.get_ident()
+    names = {t.ident: t.name for t in threading.enumerate()}
+    counts = Counter()
+    samples = 0
+    end = time.perf_counter() + seconds
+
+    while time.perf_counter() < end:
+        for tid, frame in sys._current_frames().items():
+            if tid == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(tid, f"thread-{tid}"))
+            counts[";".join(reversed(stack))] += 1
+        samples += 1
+        time.sleep(interval)
+
+    lines = [f"{stack} {count}" for stack, count in counts.most_common()]
+    return "\n".join(lines) + "\n", samples
@@ -0,0 +1,95 @@
+import os
+import sys
+import threading
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+# Add backend/training to path to import the capture pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'training')))
+import capture_pipeline
+from capture_pipeline import AsyncWriter, CapturePipeline
+
+NUM_FRAMES = 12
+
+
+class FakeDetector:
+    """Stands in for HandDetector: one 'hand' per frame, optionally failing on a given call."""
+    fail_on = None
+
+    def __init__(self, **kwargs):
+        self.calls = 0
+
+    def find_landmarks(self, img):
+        self.calls += 1
+        if self.calls == FakeDetector.fail_on:
+            raise ValueError("bad frame")
+        return [[float(img.mean())] * 63]
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (64, 48))
+    for i in range(NUM_FRAMES):
+        writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture(autouse=True)
+def fake_detector(monkeypatch):
+    FakeDetector.fail_on = None
+    monkeypatch.setattr(capture_pipeline, 'HandDetector', FakeDetector)
+
+
+def consume(pipeline, timeout=10):
+    """Iterate the pipeline on a helper thread so a hang fails the test instead of blocking it."""
+    result = {"items": [], "error": None}
+
+    def run():
+        try:
+            with pipeline:
+                for item in pipeline:
+                    result["items"].append(item)
+        except Exception as e:
+            result["error"] = e
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    t.join(timeout)
+    assert not t.is_alive(), "pipeline did not finish"
+    return result
+
+
+def test_headless_video_delivers_every_frame_in_order(video_path):
+    result = consume(CapturePipeline(video_path, headless=True))
+
+    assert result["error"] is None
+    assert [idx for idx, _, _ in result["items"]] == list(range(NUM_FRAMES))
+    assert all(frame is None for _, frame, _ in result["items"])
+    # Frame brightness increases, so landmarks must arrive in the same order
+    means = [landmarks[0][0] for _, _, landmarks in result["items"]]
+    assert means == sorted(means)
+
+
+def test_worker_error_ends_stream_and_is_reraised(video_path):
+    FakeDetector.fail_on = 5
+    result = consume(CapturePipeline(video_path, headless=True))
+
+    assert len(result["items"]) == 4
+    assert isinstance(result["error"], RuntimeError)
+    assert isinstance(result["error"].__cause__, ValueError)
+
+
+def test_async_writer_close_reraises_save_error(tmp_path):
+    writer = AsyncWriter()
+    writer.start()
+    writer.save(str(tmp_path / "ok.npy"), [1.0, 2.0])
+    writer.save(str(tmp_path / "missing" / "bad.npy"), [1.0])
+
+    with pytest.raises(RuntimeError, match="Failed to write samples"):
+        writer.close()
+    assert writer.files_written == 1
+    assert np.load(tmp_path / "ok.npy").tolist() == [1.0, 2.0]
@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+# Add parent directory to path to import profiling
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import profiling
+from profiling import StageTrace, is_admin
+
+
+def test_is_admin_matches_token(monkeypatch):
+    monkeypatch.setattr(profiling, 'ADMIN_TOKEN', 'secret')
+    assert is_admin('secret')
+    assert not is_admin('wrong')
+    assert not is_admin('')
+    assert not is_admin(None)
+
+
+def test_is_admin_rejects_non_ascii_token(monkeypatch):
+    monkeypatch.setattr(profiling, 'ADMIN_TOKEN', 'secret')
+    # Werkzeug hands headers over latin-1 decoded; this must not raise TypeError
+    assert not is_admin('sécret')
+
+
+def test_is_admin_disabled_without_token(monkeypatch):
+    monkeypatch.setattr(profiling, 'ADMIN_TOKEN', None)
+    assert not is_admin('anything')
+
+
+def test_stage_trace_accumulates_repeated_stages():
+    trace = StageTrace()
+    time.sleep(0.002)
+    trace.lap("classify")
+    trace.lap("flatten")
+    time.sleep(0.002)
+    trace.lap("classify")
+
+    stages = trace.as_dict()
+    assert set(stages) == {"classify", "flatten", "total"}
+    assert stages["classify"] >= 4
+    assert stages["total"] >= stages["classify"] + stages["flatten"] - 0.01
+
+
+def test_stage_trace_server_timing_header():
+    trace = StageTrace()
+    trace.lap("keras predict")
+    header = trace.server_timing()
+    assert header.startswith("keras_predict;dur=")
+    assert "total;dur=" in header
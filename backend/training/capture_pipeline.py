@@ -0,0 +1,219 @@
+import os
+import sys
+import time
+import queue
+import threading
+import numpy as np
+import cv2
+# Add parent directory to path to import utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils import HandDetector
+
+# End-of-stream marker passed down the queues
+STOP = object()
+# Live sources keep queues short so the preview and key presses act on current frames
+LIVE_QUEUE_SIZE = 2
+FILE_QUEUE_SIZE = 64
+
+
+def _put(q, item, stop_event):
+    """Blocking put that gives up once the pipeline is stopping."""
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+class FrameReader(threading.Thread):
+    """
+    Reads frames from a camera index or a video file into a bounded queue.
+    Live cameras never block: if the landmark worker falls behind, the frame
+    is counted as dropped so the camera keeps its native frame rate.
+    Video files block instead, so headless runs process every frame.
+    """
+
+    def __init__(self, source, out_queue, stop_event):
+        super().__init__(daemon=True)
+        self.cap = cv2.VideoCapture(source)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Could not open video source {source!r}")
+        self.live = not isinstance(source, str)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.out_queue = out_queue
+        self.stop_event = stop_event
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.error = None
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                ok, frame = self.cap.read()
+                if not ok:
+                    break
+                item = (self.frames_read, frame)
+                self.frames_read += 1
+                if self.live:
+                    try:
+                        self.out_queue.put_nowait(item)
+                    except queue.Full:
+                        self.frames_dropped += 1
+                elif not _put(self.out_queue, item, self.stop_event):
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            self.cap.release()
+            _put(self.out_queue, STOP, self.stop_event)
+
+
+class LandmarkWorker(threading.Thread):
+    """
+    Runs MediaPipe on each frame and forwards (index, frame, landmarks).
+    Indexes come from the reader, so a jump means frames were dropped.
+    """
+
+    def __init__(self, detector, in_queue, out_queue, stop_event, keep_frames=True):
+        super().__init__(daemon=True)
+        self.detector = detector
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.stop_event = stop_event
+        self.keep_frames = keep_frames
+        self.frames_processed = 0
+        self.error = None
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    item = self.in_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is STOP:
+                    break
+                idx, frame = item
+                landmarks = self.detector.find_landmarks(frame)
+                self.frames_processed += 1
+                if not _put(self.out_queue, (idx, frame if self.keep_frames else None, landmarks), self.stop_event):
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            # Always end the stream so the consumer never blocks forever
+            _put(self.out_queue, STOP, self.stop_event)
+
+
+class AsyncWriter(threading.Thread):
+    """
+    Saves .npy samples off the capture path. Pending writes are drained in
+    batches of up to `batch_size` so disk I/O happens in short bursts.
+    The first write error is kept and re-raised from save() and close().
+    """
+
+    def __init__(self, batch_size=32, queue_size=1024):
+        super().__init__(daemon=True)
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.files_written = 0
+        self.error = None
+
+    def save(self, path, array):
+        if self.error is not None:
+            raise RuntimeError(f"Writer failed, samples are not being saved: {self.error}") from self.error
+        self.queue.put((path, np.asarray(array)))
+
+    def run(self):
+        done = False
+        while not done:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            for item in batch:
+                if item is STOP:
+                    done = True
+                    continue
+                if self.error is not None:
+                    continue   # keep draining so save()/close() never block
+                path, array = item
+                try:
+                    np.save(path, array)
+                    self.files_written += 1
+                except Exception as e:
+                    self.error = e
+
+    def close(self):
+        self.queue.put(STOP)
+        self.join()
+        if self.error is not None:
+            raise RuntimeError(f"Failed to write samples: {self.error}") from self.error
+
+
+class CapturePipeline:
+    """
+    Camera-read thread -> landmark worker -> consumer, connected by bounded
+    queues. Iterate over the pipeline to receive (index, frame, landmarks);
+    frame is None in headless mode. Errors raised in the reader or landmark
+    threads are re-raised from the iterator.
+
+    Usage:
+        with CapturePipeline(source=0) as pipeline:
+            for idx, frame, landmarks in pipeline:
+                ...
+    """
+
+    def __init__(self, source=0, max_hands=1, headless=False, queue_size=None):
+        if queue_size is None:
+            queue_size = FILE_QUEUE_SIZE if isinstance(source, str) else LIVE_QUEUE_SIZE
+        self.stop_event = threading.Event()
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.results = queue.Queue(maxsize=queue_size)
+        self.reader = FrameReader(source, self.frames, self.stop_event)
+        self.worker = LandmarkWorker(HandDetector(max_hands=max_hands), self.frames, self.results,
+                                     self.stop_event, keep_frames=not headless)
+        self.fps = self.reader.fps
+        self.started_at = None
+
+    def start(self):
+        self.started_at = time.time()
+        self.reader.start()
+        self.worker.start()
+        return self
+
+    def __iter__(self):
+        while True:
+            item = self.results.get()
+            if item is STOP:
+                break
+            yield item
+        error = self.worker.error or self.reader.error
+        if error is not None:
+            raise RuntimeError(f"Capture pipeline failed: {error}") from error
+
+    def stop(self):
+        self.stop_event.set()
+        self.reader.join()
+        self.worker.join()
+
+    def stats(self):
+        elapsed = max(time.time() - (self.started_at or time.time()), 1e-9)
+        return {
+            "native_fps": round(self.fps, 1),
+            "frames_read": self.reader.frames_read,
+            "frames_dropped": self.reader.frames_dropped,
+            "frames_processed": self.worker.frames_processed,
+            "processed_fps": round(self.worker.frames_processed / elapsed, 1),
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        print(f"Capture stats: {self.stats()}")
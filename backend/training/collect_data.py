@@ -1,53 +1,73 @@
 import cv2
 import numpy as np
 import os
-import sys
-# Add parent directory to path to import utils
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils import HandDetector
+import argparse
+from capture_pipeline import AsyncWriter, CapturePipeline
 
 # Configuration
 DATA_PATH = os.path.join(os.path.dirname(__file__), '../../dataset')
 ACTIONS = np.array(['HELLO', 'THANK YOU', 'YES', 'NO', 'I LOVE YOU', 'HELP', 'STOP'])
 NO_SEQUENCES = 30
 SEQUENCE_LENGTH = 30 # For LSTM if needed
+PAUSE_SECONDS = 1.0 # Short break between sequences
 
-detector = HandDetector(max_hands=1)
-
-def collect_data():
-    for action in ACTIONS:
-        action_path = os.path.join(DATA_PATH, action)
-        if not os.path.exists(action_path):
-            os.makedirs(action_path)
-
-        cap = cv2.VideoCapture(0)
-        print(f"Collecting data for {action}. Press 's' to start recording current sequence.")
-        
-        for sequence in range(NO_SEQUENCES):
-            for frame_num in range(SEQUENCE_LENGTH):
-                ret, frame = cap.read()
-                if not ret: break
-                
-                landmarks = detector.find_landmarks(frame)
-                
-                # Display status
-                cv2.putText(frame, f'Collecting {action} | Seq: {sequence}', (15,30), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
-                cv2.imshow('OpenCV Feed', frame)
-
-                if landmarks:
-                    # Save the first hand's landmarks
-                    target_path = os.path.join(action_path, f"{sequence}_{frame_num}.npy")
-                    np.save(target_path, landmarks[0])
-
-                if cv2.waitKey(10) & 0xFF == ord('q'):
-                    break
-            
-            print(f"Finished sequence {sequence} for {action}")
-            cv2.waitKey(1000) # Short break between sequences
-
-        cap.release()
-    cv2.destroyAllWindows()
+def collect_data(source=0, headless=False, actions=ACTIONS):
+    writer = AsyncWriter()
+    writer.start()
+
+    try:
+        for action in actions:
+            action_path = os.path.join(DATA_PATH, action)
+            if not os.path.exists(action_path):
+                os.makedirs(action_path)
+
+            print(f"Collecting data for {action}. Press 'q' to skip to the next action.")
+
+            with CapturePipeline(source, max_hands=1, headless=headless) as pipeline:
+                print(f"Recording at native {pipeline.fps:.1f} FPS")
+                # The break between sequences is counted in frames so the pipeline keeps draining
+                pause_frames = int(pipeline.fps * PAUSE_SECONDS)
+                sequence, frame_num, paused = 0, 0, 0
+
+                for _, frame, landmarks in pipeline:
+                    if paused:
+                        paused -= 1
+                    else:
+                        if landmarks:
+                            # Each frame is an independent static sample, so dropped frames leave no hole
+                            target_path = os.path.join(action_path, f"{sequence}_{frame_num}.npy")
+                            writer.save(target_path, landmarks[0])
+                        frame_num += 1
+
+                    if not headless:
+                        # Display status
+                        cv2.putText(frame, f'Collecting {action} | Seq: {sequence}', (15,30),
+                                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
+                        cv2.imshow('OpenCV Feed', frame)
+                        if cv2.waitKey(1) & 0xFF == ord('q'):
+                            break
+
+                    if frame_num == SEQUENCE_LENGTH:
+                        print(f"Finished sequence {sequence} for {action}")
+                        sequence += 1
+                        frame_num, paused = 0, pause_frames
+                        if sequence == NO_SEQUENCES:
+                            break
+    finally:
+        # Flush queued samples even if capture failed or was interrupted
+        writer.close()
+        print(f"Saved {writer.files_written} samples to {DATA_PATH}")
+        if not headless:
+            cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    collect_data()
+    parser = argparse.ArgumentParser(description="Collect hand landmark samples for each action")
+    parser.add_argument('--action', choices=list(ACTIONS), help="Collect only this action")
+    parser.add_argument('--video', help="Read frames from a video file of one action (requires --action)")
+    parser.add_argument('--headless', action='store_true', help="Run without preview windows")
+    args = parser.parse_args()
+    # One clip must only ever produce one label, otherwise it is replayed under every action
+    if args.video and not args.action:
+        parser.error("--video requires --action")
+    collect_data(args.video if args.video else 0, headless=args.headless,
+                 actions=[args.action] if args.action else ACTIONS)
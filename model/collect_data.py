@@ -2,86 +2,115 @@ import cv2
 import numpy as np
 import os
 import sys
-import time
+import argparse
 
-# Add backend to path to use HandDetector
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
-from utils import HandDetector
+# Add backend/training to path to use the threaded capture pipeline (and HandDetector)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend/training')))
+from capture_pipeline import AsyncWriter, CapturePipeline
 
-def collect_sequences(label, sequence_length=30, num_sequences=30):
-    detector = HandDetector()
-    cap = cv2.VideoCapture(0)
-    
+# Restarts allowed per sequence when the camera drops frames; after that the sequence is kept with gaps
+MAX_RESTARTS = 3
+
+def collect_sequences(label, sequence_length=30, num_sequences=30, source=0, headless=False):
     # Path for exported data, numpy arrays
     DATA_PATH = os.path.join(os.path.dirname(__file__), "../dataset/sequences")
     if not os.path.exists(DATA_PATH):
         os.makedirs(DATA_PATH)
-        
+
     label_path = os.path.join(DATA_PATH, label)
     if not os.path.exists(label_path):
         os.makedirs(label_path)
 
     print(f"Starting collection for {label}. You will collect {num_sequences} sequences of {sequence_length} frames each.")
-    print("Press 's' to start a sequence collection, 'q' to quit.")
+    if headless:
+        print("Headless mode: sequences are recorded back to back.")
+    else:
+        print("Press 's' to start a sequence collection, 'q' to quit.")
+
+    writer = AsyncWriter()
+    writer.start()
 
     sequence_count = 0
-    while sequence_count < num_sequences:
-        success, img = cap.read()
-        if not success: break
-        
-        img, landmarks, bbox = detector.find_hands(img)
-        
-        cv2.putText(img, f"Label: {label} | Collected: {sequence_count}/{num_sequences}", (10, 30), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        cv2.putText(img, "Press 's' to start sequence", (10, 60), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-        
-        cv2.imshow("Data Collection", img)
-        
-        key = cv2.waitKey(1)
-        if key & 0xFF == ord('q'):
-            break
-        
-        if key & 0xFF == ord('s'):
-            sequence = []
-            print(f"Collecting sequence {sequence_count}...")
-            
-            # Start collecting frames for the sequence
-            frame_num = 0
-            while frame_num < sequence_length:
-                success, img = cap.read()
-                if not success: break
-                
-                img, landmarks, bbox = detector.find_hands(img)
-                
-                # If hand detected, add to sequence, else add zeros (or ignore frame)
-                if landmarks:
-                    # MediaPipe gives 21 landmarks with x,y,z
-                    landmarks_flat = detector.get_landmarks_array(landmarks)
-                    sequence.append(landmarks_flat)
-                    frame_num += 1
+    sequence = None   # None while waiting for 's', list while recording
+    restarts = 0
+    has_gaps = False
+    last_idx = None
+    try:
+        with CapturePipeline(source, max_hands=1, headless=headless) as pipeline:
+            print(f"Recording at native {pipeline.fps:.1f} FPS")
+            for idx, img, landmarks in pipeline:
+                # A jump in the frame index means the camera dropped frames
+                gap = last_idx is not None and idx != last_idx + 1
+                last_idx = idx
+
+                if sequence is None and headless:
+                    sequence = []
+                    print(f"Collecting sequence {sequence_count}...")
+
+                if sequence is not None:
+                    if gap and sequence:
+                        stats = pipeline.stats()
+                        drop_rate = stats["frames_dropped"] / max(stats["frames_read"], 1)
+                        if restarts < MAX_RESTARTS:
+                            restarts += 1
+                            print(f"Dropped frames in sequence {sequence_count} ({drop_rate:.0%} of frames dropped so far), "
+                                  f"restarting it ({restarts}/{MAX_RESTARTS})")
+                            sequence = []
+                        elif not has_gaps:
+                            has_gaps = True
+                            print(f"Landmark detection cannot keep up ({drop_rate:.0%} of frames dropped); "
+                                  f"keeping sequence {sequence_count} with gaps")
+
+                    # Wait until a hand is detected to count the frame, so every sequence has the same length
+                    if landmarks:
+                        # MediaPipe gives 21 landmarks with x,y,z, already flattened to 63 values
+                        sequence.append(landmarks[0])
+
+                    if len(sequence) == sequence_length:
+                        npy_path = os.path.join(label_path, f"{label}_{sequence_count}.npy")
+                        writer.save(npy_path, np.array(sequence))
+                        sequence_count += 1
+                        sequence = None
+                        restarts, has_gaps = 0, False
+                        print(f"Saved {npy_path}")
+                        if sequence_count == num_sequences:
+                            break
+
+                if headless:
+                    continue
+
+                if sequence is None:
+                    cv2.putText(img, f"Label: {label} | Collected: {sequence_count}/{num_sequences}", (10, 30),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                    cv2.putText(img, "Press 's' to start sequence", (10, 60),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
                 else:
-                    # For LSTM, we need consistent frame counts. If no hand, use previous frame or zeros.
-                    # Here we wait until a hand is detected to count the frame
-                    cv2.putText(img, "Hand NOT detected! Waiting...", (10, 90), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-                
-                cv2.putText(img, f"RECORDING Sequence {sequence_count}: Frame {frame_num}/{sequence_length}", (10, 30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+                    if not landmarks:
+                        cv2.putText(img, "Hand NOT detected! Waiting...", (10, 90),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+                    cv2.putText(img, f"RECORDING Sequence {sequence_count}: Frame {len(sequence)}/{sequence_length}", (10, 30),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
                 cv2.imshow("Data Collection", img)
-                cv2.waitKey(1)
 
-            # Save the sequence
-            npy_path = os.path.join(label_path, f"{label}_{sequence_count}.npy")
-            np.save(npy_path, np.array(sequence))
-            sequence_count += 1
-            print(f"Saved {npy_path}")
-            
-    cap.release()
-    cv2.destroyAllWindows()
+                key = cv2.waitKey(1)
+                if key & 0xFF == ord('q'):
+                    break
+                if key & 0xFF == ord('s') and sequence is None:
+                    sequence = []
+                    print(f"Collecting sequence {sequence_count}...")
+    finally:
+        # Flush queued sequences even if capture failed or was interrupted
+        writer.close()
+        if not headless:
+            cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python collect_data.py <label>")
-    else:
-        collect_sequences(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Collect landmark sequences for one label")
+    parser.add_argument('label')
+    parser.add_argument('--video', help="Read frames from a video file instead of the webcam")
+    parser.add_argument('--headless', action='store_true', help="Run without preview windows")
+    parser.add_argument('--sequence-length', type=int, default=30)
+    parser.add_argument('--num-sequences', type=int, default=30)
+    args = parser.parse_args()
+    collect_sequences(args.label, args.sequence_length, args.num_sequences,
+                      source=args.video if args.video else 0, headless=args.headless)